@@ -0,0 +1,39 @@
+"""Add composite index for latest email verification code lookups.
+
+Replaces ix_email_codes_email_purpose, whose (email, purpose) prefix the new
+index already covers.
+
+Revision ID: f6g7h8i9j0k1
+Revises: e5f6g7h8i9j0
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f6g7h8i9j0k1"
+down_revision: Union[str, Sequence[str], None] = "e5f6g7h8i9j0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_email_codes_email_purpose_created",
+        "email_verification_codes",
+        ["email", "purpose", sa.text("created_at DESC")],
+    )
+    op.drop_index("ix_email_codes_email_purpose", table_name="email_verification_codes")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_email_codes_email_purpose",
+        "email_verification_codes",
+        ["email", "purpose"],
+    )
+    op.drop_index("ix_email_codes_email_purpose_created", table_name="email_verification_codes")
@@ -31,6 +31,8 @@ class Settings(BaseSettings):
     )
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    # bcrypt cost factor (2^rounds iterations). Keep 12 in production; tests lower it.
+    BCRYPT_ROUNDS: int = Field(default=12, ge=4, le=31)
 
     # Comma-separated CORS origins. Avoid wildcard origins for credentialed APIs.
     ALLOWED_ORIGINS: str = Field(
@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-import bcrypt
 import jwt
 
 from app.core import config
@@ -12,24 +11,32 @@ def _settings():
     return config.settings
 
 
+def _build_claims(data: dict, expires_delta: Optional[timedelta] = None) -> dict:
+    # Unsigned token payload; exp is an integer Unix timestamp, exactly as PyJWT would encode it.
+    claims = data.copy()
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=_settings().ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.now(timezone.utc) + expires_delta
+    claims["exp"] = int(expire.timestamp())
+    return claims
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    to_encode = data.copy()
     settings = _settings()
-    if expires_delta is not None:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return jwt.encode(_build_claims(data, expires_delta), settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    # bcrypt is imported on first use so JWT-only importers skip loading its C extension.
+    import bcrypt
+
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
 def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    import bcrypt
+
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=_settings().BCRYPT_ROUNDS)).decode("utf-8")
 
 
 def verify_token(token: str) -> Optional[dict]:
@@ -29,7 +29,7 @@ class EmailVerificationCode(Base):
     expires_at = Column(DateTime(timezone=True), nullable=False)
 
     __table_args__ = (
-        Index("ix_email_codes_email_purpose", "email", "purpose"),
+        Index("ix_email_codes_email_purpose_created", "email", "purpose", created_at.desc()),
     )
 
     def __repr__(self) -> str:
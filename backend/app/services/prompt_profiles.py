@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import copy
+import functools
 import json
 import re
 import threading
@@ -142,12 +143,17 @@ class PromptRegistry:
                 self._alias_map[_normalize(alias)] = profile.key
         if "general" not in self._profiles:
             raise ValueError("Prompt registry requires a 'general' profile")
+        # Memoise per registry: a reload builds a new registry, so stale entries die with the old one.
+        self._resolve_cached = functools.lru_cache(maxsize=128)(self._resolve_uncached)
 
     @property
     def profiles(self) -> Dict[str, PromptProfile]:
         return self._profiles
 
     def resolve(self, note_type: str) -> PromptProfile:
+        return self._resolve_cached(note_type)
+
+    def _resolve_uncached(self, note_type: str) -> PromptProfile:
         key = self._alias_map.get(_normalize(note_type))
         if key is None:
             return self._profiles["general"]
@@ -0,0 +1,18 @@
+"""测试用路由常量
+
+路由前缀变化时只需改这里，各测试模块统一 `from tests._urls import ...`。
+"""
+
+API_V1 = "/api/v1"
+LIBRARY = f"{API_V1}/library"
+
+NOTES = f"{LIBRARY}/notes"
+NOTES_SYNC = f"{NOTES}/sync"
+NOTES_BATCH = f"{NOTES}/batch"
+NOTES_MUTATIONS = f"{NOTES}/mutations"
+NOTES_FROM_IMAGE = f"{NOTES}/from-image"
+
+
+def note_url(note_id: str) -> str:
+    """单条笔记详情路由"""
+    return f"{NOTES}/{note_id}"
@@ -1,33 +1,155 @@
 import os
+import shutil
 import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # Force a deterministic local test configuration.
 os.environ["SECRET_KEY"] = "test-secret-key-with-sufficient-length-32-bytes-minimum-requirement"
 os.environ["ALLOWED_ORIGINS"] = "http://localhost:3000,http://localhost:5173"
-os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+# In-memory SQLite is private to each process, so every pytest-xdist worker
+# (`pytest -n auto`) gets its own database without any per-worker naming.
+os.environ["DATABASE_URL"] = "sqlite://"
 os.environ["DEBUG"] = "false"
+# Minimum bcrypt cost: tests check hash format and round-trips, not hashing strength.
+# Tests marked `security_slow` get the production cost back via the _bcrypt_cost fixture.
+os.environ["BCRYPT_ROUNDS"] = "4"
 
-from app.core.security import get_password_hash
-from app.database import Base
-from app.main import app
+from app.core.config import settings
+from app.core.security import create_access_token, get_password_hash
+from app.database import Base, SessionLocal, engine
 
 
-@pytest.fixture(scope="function")
-def db_session() -> Session:
-    engine = create_engine("sqlite:///:memory:", echo=False)
+def _relax_sqlite_durability(dbapi_connection, connection_record):
+    # Test databases are disposable: skip fsync and keep the rollback journal in memory.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.close()
+
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _relax_sqlite_durability)
+
+
+def pytest_collection_modifyitems(config, items):
+    # Timing assertions are meaningless while other xdist workers compete for the CPU.
+    if not os.environ.get("PYTEST_XDIST_WORKER"):
+        return
+    skip_serial = pytest.mark.skip(reason="serial test: rerun without -n (pytest -m serial --no-cov)")
+    for item in items:
+        if item.get_closest_marker("serial") is not None:
+            item.add_marker(skip_serial)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    # Build the shared test database schema once per session instead of at module import.
+    # Importing the models package registers every table without building the FastAPI app.
+    import app.models  # noqa: F401
+
     Base.metadata.create_all(bind=engine)
-    SessionLocal = sessionmaker(bind=engine)
-    session = SessionLocal()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="session")
+def db_template(tmp_path_factory):
+    """Create a migrated SQLite file once; ``fresh_db`` copies it per test."""
+    template_path = tmp_path_factory.mktemp("db") / "test_template.sqlite"
+    template_engine = create_engine(f"sqlite:///{template_path}")
+    Base.metadata.create_all(bind=template_engine)
+    template_engine.dispose()
+    return template_path
+
+
+@pytest.fixture
+def fresh_db(db_template, tmp_path):
+    """Sessionmaker bound to a private copy of the template database.
+
+    Copying the file is much cheaper than rerunning ``create_all`` and needs no
+    cleanup queries, since the copy is discarded with ``tmp_path``.
+    """
+    db_path = tmp_path / "test.sqlite"
+    shutil.copyfile(db_template, db_path)
+    fresh_engine = create_engine(f"sqlite:///{db_path}")
+    event.listen(fresh_engine, "connect", _relax_sqlite_durability)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=fresh_engine)
+    fresh_engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def seeded_profiles(tmp_path_factory):
+    """Point the prompt profile manager at a session-wide copy of profiles.json.
+
+    The source file is read and parsed once; tests that save or delete profiles
+    only touch the temporary copy.
+    """
+    from app.services.prompt_profiles import prompt_profile_manager
+
+    original_path = prompt_profile_manager.path
+    seeded_path = tmp_path_factory.mktemp("prompt_profiles") / "profiles.json"
+    seeded_path.write_text(Path(settings.PROMPT_PROFILES_PATH).read_text(encoding="utf-8"), encoding="utf-8")
+    prompt_profile_manager.path = seeded_path
+    prompt_profile_manager.reload(force=True)
+    yield seeded_path
+    prompt_profile_manager.path = original_path
+    prompt_profile_manager.reload(force=True)
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    engine = create_engine(
+        "sqlite://",
+        echo=False,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    # pysqlite manages transactions itself and breaks SAVEPOINT; let SQLAlchemy emit BEGIN instead.
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    event.listen(engine, "connect", _relax_sqlite_durability)
+
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def db_session(db_engine) -> Session:
+    # Join the session to an outer transaction; service-level commit() only releases a SAVEPOINT,
+    # and the whole test is rolled back in teardown instead of recreating the schema.
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
     try:
         yield session
     finally:
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def note_service(db_session):
+    from app.services.note_service import NoteService
+
+    return NoteService(db_session)
 
 
 @pytest.fixture
@@ -46,61 +168,142 @@ def test_user(db_session: Session):
     return user
 
 
+@pytest.fixture(scope="session")
+def png_bytes() -> bytes:
+    """A valid 1x1 PNG kept in memory for upload endpoints."""
+    return (
+        b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01"
+        b"\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde\x00\x00"
+        b"\x00\x0cIDATx\x9cc\xf8\xff\xff?\x00\x05\xfe\x02\xfe"
+        b"\xdc\xccY\xe7\x00\x00\x00\x00IEND\xaeB`\x82"
+    )
+
+
+@pytest.fixture(autouse=True)
+def _bcrypt_cost(request, monkeypatch):
+    """Restore the production bcrypt cost for tests marked ``security_slow``."""
+    if request.node.get_closest_marker("security_slow") is None:
+        return
+    from app.core import config
+
+    production_rounds = type(config.settings).model_fields["BCRYPT_ROUNDS"].default
+    monkeypatch.setattr(config.settings, "BCRYPT_ROUNDS", production_rounds)
+
+
+@pytest.fixture(scope="session")
+def app_obj():
+    # Import lazily so collection (e.g. `pytest -k test_health`) does not build the app.
+    from app.core.dependencies import check_doubao_available
+    from app.main import app
+
+    # Doubao-gated routes always pass the availability check; tests that exercise a
+    # Doubao call still patch the service used by the code under test.
+    app.dependency_overrides[check_doubao_available] = lambda: None
+    yield app
+    app.dependency_overrides.pop(check_doubao_available, None)
+
+
 @pytest.fixture
-def test_client():
-    with TestClient(app) as client:
+def real_doubao_check(app_obj):
+    """Run the real ``check_doubao_available`` for one test, then restore the override."""
+    from app.core.dependencies import check_doubao_available
+
+    override = app_obj.dependency_overrides.pop(check_doubao_available)
+    yield
+    app_obj.dependency_overrides[check_doubao_available] = override
+
+
+@pytest.fixture(scope="session")
+def test_client(app_obj):
+    # One client (and one lifespan startup) shared by the whole session.
+    with TestClient(app_obj) as client:
+        yield client
+
+
+@pytest_asyncio.fixture
+async def aclient(app_obj):
+    # Drives the app directly over ASGI, so independent requests can be gathered
+    # on one event loop. Lifespan is not run; the _schema fixture already built the tables.
+    async with AsyncClient(transport=ASGITransport(app=app_obj), base_url="http://test") as client:
         yield client
 
 
+# Static bcrypt hash: users minted for non-auth tests never log in with a password.
+_UNUSED_PASSWORD_HASH = "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5NU2DJO3CqPCa"
+
+
+def _create_user_with_token(username: str) -> tuple[str, str]:
+    """Insert a user row and mint its JWT directly, skipping the register/login endpoints."""
+    from app.models.user import User
+
+    user_id = str(uuid.uuid4())
+    with SessionLocal() as session:
+        session.add(
+            User(
+                id=user_id,
+                username=username,
+                email=f"{username}@example.com",
+                password_hash=_UNUSED_PASSWORD_HASH,
+            )
+        )
+        session.commit()
+    return user_id, create_access_token({"sub": username})
+
+
+@pytest.fixture(scope="session")
+def auth_user() -> tuple[str, str]:
+    """(user_id, token) for a user created once and shared by the session.
+
+    Use it when a test only needs an authenticated caller; tests that must not
+    see other tests' data should use ``fresh_auth_user`` instead.
+    """
+    return _create_user_with_token(f"shared_{uuid.uuid4().hex[:12]}")
+
+
 @pytest.fixture
-def auth_token(test_client):
-    username = f"testuser_{uuid.uuid4().hex[:8]}"
-    password = "TestPassword123"
-    email = f"{username}@example.com"
-
-    register_response = test_client.post(
-        "/api/v1/auth/register",
-        json={"username": username, "password": password, "email": email},
-    )
-    assert register_response.status_code in (200, 201)
+def fresh_auth_user() -> tuple[str, str]:
+    return _create_user_with_token(f"testuser_{uuid.uuid4().hex[:8]}")
 
-    login_response = test_client.post(
-        "/api/v1/auth/login",
-        json={"username": username, "password": password},
-    )
-    assert login_response.status_code == 200
-    return login_response.json()["access_token"]
+
+@pytest.fixture
+def auth_token(auth_user) -> str:
+    return auth_user[1]
+
+
+@dataclass(frozen=True, slots=True)
+class _StubDoubao:
+    """Minimal stand-in for ``doubao_service`` used by pipeline/endpoint tests."""
+
+    is_available: bool = True
+    note_payload: dict | None = None
+    error: Exception | None = None
+    unavailable_reason: str | None = None
+    calls: list = field(default_factory=list)
+
+    def availability_status(self):
+        return self.is_available, None if self.is_available else self.unavailable_reason
+
+    def generate_structured_note(
+        self,
+        image_paths,
+        *,
+        note_type,
+        tags,
+        detail=None,
+        max_completion_tokens=None,
+        thinking=None,
+    ):
+        self.calls.append({"image_paths": image_paths, "note_type": note_type, "tags": tags})
+        if self.error is not None:
+            raise self.error
+        payload = self.note_payload or {}
+        return {
+            "note": payload,
+            "raw_text": payload.get("raw_text", ""),
+            "response": {"id": "resp-1", "usage": {"input_tokens": 10, "output_tokens": 20}},
+        }
 
 
 @pytest.fixture
-def mock_doubao_service(monkeypatch):
-    class MockDoubaoService:
-        is_available = True
-
-        @staticmethod
-        def availability_status():
-            return True, None
-
-        @staticmethod
-        def generate_structured_note(*args, **kwargs):
-            return {
-                "note": {
-                    "title": "Mock note title",
-                    "summary": "Mock summary",
-                    "raw_text": "Mock raw text",
-                    "category": "Learning note",
-                }
-            }
-
-        @staticmethod
-        def generate_plain_text(*args, **kwargs):
-            return {
-                "text": "Mock extracted text",
-                "format": "markdown",
-                "response": {},
-            }
-
-    mock = MockDoubaoService()
-    monkeypatch.setattr("app.services.doubao_service.doubao_service", mock)
-    monkeypatch.setattr("app.core.dependencies.doubao_service", mock)
-    return mock
+def doubao_stub():
+    return _StubDoubao
@@ -3,65 +3,62 @@ import uuid
 
 import jwt
 import pytest
-from fastapi.testclient import TestClient
 
 from app.core.security import create_access_token
 from app.database import SessionLocal
-from app.main import app
 from app.services.note_service import NoteService
-
-client = TestClient(app)
+from tests._urls import NOTES, note_url
 
 
 @pytest.mark.security
-def test_jwt_token_expiration():
+def test_jwt_token_expiration(test_client):
     expired_token = create_access_token(data={"sub": "test_user"}, expires_delta=timedelta(seconds=-10))
-    response = client.get("/api/v1/library/notes", headers={"Authorization": f"Bearer {expired_token}"})
+    response = test_client.get(NOTES, headers={"Authorization": f"Bearer {expired_token}"})
     assert response.status_code == 401
     assert response.json().get("detail")
 
 
 @pytest.mark.security
-def test_invalid_token_rejected():
-    response = client.get("/api/v1/library/notes", headers={"Authorization": "Bearer invalid-token-12345"})
+def test_invalid_token_rejected(test_client):
+    response = test_client.get(NOTES, headers={"Authorization": "Bearer invalid-token-12345"})
     assert response.status_code == 401
 
-    response = client.get("/api/v1/library/notes", headers={"Authorization": "Bearer "})
+    response = test_client.get(NOTES, headers={"Authorization": "Bearer "})
     assert response.status_code == 401
 
     fake_token = jwt.encode({"sub": "attacker"}, "wrong-secret-key", algorithm="HS256")
-    response = client.get("/api/v1/library/notes", headers={"Authorization": f"Bearer {fake_token}"})
+    response = test_client.get(NOTES, headers={"Authorization": f"Bearer {fake_token}"})
     assert response.status_code == 401
 
 
 @pytest.mark.security
-def test_unauthorized_access_denied():
-    response = client.get("/api/v1/library/notes")
+def test_unauthorized_access_denied(test_client):
+    response = test_client.get(NOTES)
     assert response.status_code == 401
     assert response.json().get("detail")
 
 
 @pytest.mark.security
-def test_user_cannot_access_other_users_notes():
+def test_user_cannot_access_other_users_notes(test_client):
     suffix = uuid.uuid4().hex[:8]
     user_a = f"auth_sec_user_a_{suffix}"
     user_b = f"auth_sec_user_b_{suffix}"
     pwd_a = "PasswordA123"
     pwd_b = "PasswordB123"
 
-    register_a = client.post(
+    register_a = test_client.post(
         "/api/v1/auth/register",
         json={"username": user_a, "password": pwd_a, "email": f"{user_a}@example.com"},
     )
-    register_b = client.post(
+    register_b = test_client.post(
         "/api/v1/auth/register",
         json={"username": user_b, "password": pwd_b, "email": f"{user_b}@example.com"},
     )
     assert register_a.status_code in (200, 201)
     assert register_b.status_code in (200, 201)
 
-    login_a = client.post("/api/v1/auth/login", json={"username": user_a, "password": pwd_a})
-    login_b = client.post("/api/v1/auth/login", json={"username": user_b, "password": pwd_b})
+    login_a = test_client.post("/api/v1/auth/login", json={"username": user_a, "password": pwd_a})
+    login_b = test_client.post("/api/v1/auth/login", json={"username": user_b, "password": pwd_b})
     assert login_a.status_code == 200
     assert login_b.status_code == 200
     token_a = login_a.json()["access_token"]
@@ -85,8 +82,8 @@ def test_user_cannot_access_other_users_notes():
         )
         note_id = str(note.id)
 
-    response_a = client.get(f"/api/v1/library/notes/{note_id}", headers={"Authorization": f"Bearer {token_a}"})
+    response_a = test_client.get(note_url(note_id), headers={"Authorization": f"Bearer {token_a}"})
     assert response_a.status_code == 200
 
-    response_b = client.get(f"/api/v1/library/notes/{note_id}", headers={"Authorization": f"Bearer {token_b}"})
+    response_b = test_client.get(note_url(note_id), headers={"Authorization": f"Bearer {token_b}"})
     assert response_b.status_code in (403, 404)
@@ -3,14 +3,10 @@
 验证 CORS 限制为白名单域名, 拒绝非法 Origin
 """
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
+from tests._urls import NOTES
 
 
-client = TestClient(app)
-
-
-def test_cors_rejects_unknown_origin():
+def test_cors_rejects_unknown_origin(test_client):
     """验证 CORS 拒绝非白名单域名的请求
 
     改前风险: allow_origins=["*"] 允许任何域名访问
@@ -24,7 +20,7 @@ def test_cors_rejects_unknown_origin():
     }
 
     # OPTIONS 预检请求 (CORS preflight)
-    response = client.options("/api/v1/library/notes", headers=headers)
+    response = test_client.options(NOTES, headers=headers)
 
     # 验证响应头
     # 注意: 当 Origin 不在白名单时, FastAPI 不会返回 Access-Control-Allow-Origin
@@ -35,7 +31,7 @@ def test_cors_rejects_unknown_origin():
     assert "evil.com" not in allow_origin
 
 
-def test_cors_allows_whitelisted_origin():
+def test_cors_allows_whitelisted_origin(test_client):
     """验证 CORS 允许白名单域名的请求
 
     预期行为: localhost:3000 和 localhost:5173 在默认白名单中
@@ -52,7 +48,7 @@ def test_cors_allows_whitelisted_origin():
             "Access-Control-Request-Method": "GET",
         }
 
-        response = client.options("/api/v1/library/notes", headers=headers)
+        response = test_client.options(NOTES, headers=headers)
 
         # 验证 CORS 响应头
         allow_origin = response.headers.get("Access-Control-Allow-Origin", "")
@@ -61,7 +57,7 @@ def test_cors_allows_whitelisted_origin():
         assert origin in allow_origin or allow_origin == origin, f"Origin {origin} 应在白名单中"
 
 
-def test_cors_methods_limited():
+def test_cors_methods_limited(test_client):
     """验证 CORS 仅允许必要的 HTTP 方法
 
     改前风险: allow_methods=["*"] 允许所有 HTTP 方法
@@ -72,7 +68,7 @@ def test_cors_methods_limited():
         "Access-Control-Request-Method": "GET",
     }
 
-    response = client.options("/api/v1/library/notes", headers=headers)
+    response = test_client.options(NOTES, headers=headers)
 
     # 获取允许的方法
     allow_methods = response.headers.get("Access-Control-Allow-Methods", "")
@@ -136,6 +136,8 @@ def test_password_verification_security():
 
 @pytest.mark.security
 @pytest.mark.slow
+@pytest.mark.security_slow
+@pytest.mark.serial
 def test_bcrypt_performance():
     """测试: bcrypt 哈希性能 (计算成本)
 
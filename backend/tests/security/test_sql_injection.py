@@ -2,21 +2,31 @@
 
 验证 search_notes 方法使用 ORM 参数化查询, 防止 SQL 注入攻击
 """
+import uuid
+from datetime import datetime, timezone
+
 import pytest
-from sqlalchemy.orm import Session
-from app.services.note_service import NoteService
+from sqlalchemy import func, select
 from app.models.note import Note
-from app.database import SessionLocal
-
 
-@pytest.fixture
-def db_session():
-    """测试数据库会话"""
-    session = SessionLocal()
-    try:
-        yield session
-    finally:
-        session.close()
+# 测试数据在模块导入时构建一次, 各测试共享
+_SPECIAL_CHARS = (
+    "%",       # SQL 通配符
+    "_",       # SQL 通配符
+    "'",       # SQL 字符串分隔符
+    "\"",      # SQL 字符串分隔符
+    "--",      # SQL 注释
+    ";",       # SQL 语句分隔符
+    "' OR '1'='1",  # 常见注入模式
+)
+
+_MALICIOUS_QUERIES = (
+    "'; DROP TABLE notes;--",
+    "' OR '1'='1",
+    "'; DELETE FROM notes WHERE 1=1;--",
+    "' UNION SELECT NULL--",
+    "admin'--",
+)
 
 
 @pytest.fixture
@@ -25,38 +35,44 @@ def test_user_id():
     return "test-user-sql-injection"
 
 
+def _note_rows(user_id: str, notes: list[dict]) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "device_id": user_id,
+            "category": "测试",
+            "is_archived": False,
+            "created_at": now,
+            "updated_at": now,
+            **note,
+        }
+        for note in notes
+    ]
+
+
 @pytest.fixture
 def setup_test_notes(db_session, test_user_id):
-    """创建测试笔记数据"""
-    note_service = NoteService(db_session)
+    """创建测试笔记数据
 
-    # 创建测试笔记
+    db_session (conftest) 在 SAVEPOINT 中运行, 测试结束整体回滚, 无需手动清理
+    这些笔记只作为搜索目标, 用 bulk_insert_mappings 一次批量 INSERT, 跳过 unit-of-work
+    """
     test_notes = [
         {"title": "正常笔记", "original_text": "这是正常的笔记内容"},
         {"title": "学习笔记", "original_text": "Python SQL 注入防护"},
         {"title": "工作笔记", "original_text": "安全编程最佳实践"},
     ]
+    db_session.bulk_insert_mappings(Note, _note_rows(test_user_id, test_notes))
 
-    created_notes = []
-    for note_data in test_notes:
-        note = note_service.create_note(note_data, test_user_id)
-        created_notes.append(note)
-
-    yield created_notes
-
-    # 清理测试数据
-    for note in created_notes:
-        db_session.delete(note)
-    db_session.commit()
 
-
-def test_search_notes_prevents_drop_table(db_session, test_user_id, setup_test_notes):
+def test_search_notes_prevents_drop_table(note_service, test_user_id, setup_test_notes):
     """测试: 防止 DROP TABLE 注入攻击
 
     攻击向量: '; DROP TABLE notes;--
     预期行为: 查询返回空结果或无匹配, 数据库表未被删除
     """
-    note_service = NoteService(db_session)
 
     # SQL 注入攻击: 尝试删除 notes 表
     malicious_query = "'; DROP TABLE notes;--"
@@ -72,13 +88,12 @@ def test_search_notes_prevents_drop_table(db_session, test_user_id, setup_test_n
     assert len(all_notes) > 0, "数据库表不应被删除"
 
 
-def test_search_notes_prevents_union_select(db_session, test_user_id, setup_test_notes):
+def test_search_notes_prevents_union_select(note_service, test_user_id, setup_test_notes):
     """测试: 防止 UNION SELECT 注入攻击
 
     攻击向量: ' UNION SELECT * FROM users--
     预期行为: 查询返回空结果或无匹配, 不泄露其他表数据
     """
-    note_service = NoteService(db_session)
 
     # SQL 注入攻击: 尝试通过 UNION 查询其他表
     malicious_query = "' UNION SELECT * FROM users--"
@@ -91,13 +106,12 @@ def test_search_notes_prevents_union_select(db_session, test_user_id, setup_test
         assert isinstance(item, Note), "返回结果应为 Note 对象, 不应泄露其他表数据"
 
 
-def test_search_notes_prevents_update_injection(db_session, test_user_id, setup_test_notes):
+def test_search_notes_prevents_update_injection(note_service, test_user_id, setup_test_notes):
     """测试: 防止 UPDATE 注入攻击
 
     攻击向量: '; UPDATE notes SET user_id='attacker';--
     预期行为: 查询不应修改数据库数据
     """
-    note_service = NoteService(db_session)
 
     # 记录原始笔记的 user_id
     original_notes = note_service.get_user_notes(test_user_id)
@@ -114,53 +128,47 @@ def test_search_notes_prevents_update_injection(db_session, test_user_id, setup_
         assert note.user_id == original_user_ids[note.id], "笔记 user_id 不应被修改"
 
 
-def test_search_notes_special_chars(db_session, test_user_id, setup_test_notes):
+def test_search_notes_special_chars(note_service, db_session, test_user_id):
     """测试: 特殊字符处理
 
     验证: 包含特殊 SQL 字符的正常查询能正确工作
+    所有字符的笔记一次批量插入, 在同一事务内循环搜索, 只付一次 fixture 开销
     """
-    note_service = NoteService(db_session)
-
-    # 包含特殊字符的查询 (%, _, ', ")
-    special_queries = [
-        "%",       # SQL 通配符
-        "_",       # SQL 通配符
-        "'",       # SQL 字符串分隔符
-        "\"",      # SQL 字符串分隔符
-        "' OR '1'='1",  # 常见注入模式
-    ]
+    db_session.bulk_insert_mappings(
+        Note,
+        _note_rows(
+            test_user_id,
+            [{"title": f"笔记{char}测试", "original_text": "特殊字符测试"} for char in _SPECIAL_CHARS],
+        ),
+    )
 
-    for query in special_queries:
-        # 应该安全处理, 不抛出异常
+    for query in _SPECIAL_CHARS:
+        # 应该安全处理, 不抛出异常, 且能命中标题含该字符的笔记
         result = note_service.search_notes(test_user_id, query)
         assert isinstance(result, list), f"查询 '{query}' 应返回列表"
+        assert any(query in note.title for note in result), f"查询 '{query}' 应命中对应笔记"
+
 
+def _count_notes(db_session) -> int:
+    return db_session.execute(select(func.count()).select_from(Note)).scalar_one()
 
-def test_database_integrity_after_injection_attempt(db_session, test_user_id, setup_test_notes):
+
+def test_database_integrity_after_injection_attempt(note_service, db_session, test_user_id, setup_test_notes):
     """测试: 注入攻击后数据库完整性验证
 
-    验证: 多次注入攻击后, 数据库结构和数据完整
+    验证: 注入攻击后, 数据库结构和数据完整
+    基线行数只统计一次, 全部攻击向量执行完后再统一比对, 避免每个向量一次 COUNT(*)
     """
-    note_service = NoteService(db_session)
-
-    # 执行多种注入攻击
-    injection_patterns = [
-        "'; DROP TABLE notes;--",
-        "' OR '1'='1",
-        "'; DELETE FROM notes WHERE 1=1;--",
-        "' UNION SELECT NULL--",
-        "admin'--",
-    ]
+    baseline = _count_notes(db_session)
+    assert baseline >= 3, "数据库应包含原始测试笔记"
 
-    for pattern in injection_patterns:
-        try:
-            note_service.search_notes(test_user_id, pattern)
-        except Exception:
-            pass  # 即使抛出异常, 也不应破坏数据库
+    # 执行注入攻击 (参数化查询不应抛异常; 一旦抛出, pytest 直接报告完整 traceback)
+    for pattern in _MALICIOUS_QUERIES:
+        result = note_service.search_notes(test_user_id, pattern)
+        assert isinstance(result, list), f"查询 '{pattern}' 应返回列表"
 
     # 验证: 数据库表仍然存在, 数据完整
-    all_notes = note_service.get_user_notes(test_user_id)
-    assert len(all_notes) >= 3, "数据库应包含原始测试笔记"
+    assert _count_notes(db_session) == baseline, "注入攻击不应增删任何笔记"
 
     # 验证: 可以正常创建新笔记
     new_note = note_service.create_note(
@@ -168,7 +176,3 @@ def test_database_integrity_after_injection_attempt(db_session, test_user_id, se
         test_user_id
     )
     assert new_note.id is not None, "应能正常创建新笔记"
-
-    # 清理新笔记
-    db_session.delete(new_note)
-    db_session.commit()
@@ -10,9 +10,14 @@
 
 import pytest
 from datetime import datetime, timedelta, timezone
-from app.core.security import create_access_token
+from freezegun import freeze_time
+from app.core.config import settings
+from app.core.security import _build_claims
 
+_UTC = timezone.utc
 
+
+@freeze_time("2024-01-01 00:00:00", tz_offset=0)
 def test_jwt_exp_is_timezone_aware():
     """测试 JWT token 的 exp 字段使用 timezone-aware datetime
 
@@ -21,30 +26,16 @@ def test_jwt_exp_is_timezone_aware():
     - 使用 timezone-aware datetime 确保时区转换正确
     - datetime.now(timezone.utc) 返回的 datetime 对象包含 tzinfo 信息
     """
-    import jwt
-    from app.core.config import settings
-
-    # 创建 JWT token (默认过期时间)
-    token = create_access_token(data={"sub": "test_user"})
+    # 时钟已冻结, 签发时刻即 now
+    now = datetime(2024, 1, 1, tzinfo=_UTC)
 
-    # 解码 token (不验证签名, 仅获取 payload)
-    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-
-    # 验证: exp 字段是 Unix 时间戳 (整数)
+    # 直接检查签名前的 claims (默认过期时间); 签名往返见 tests/unit/core/test_security.py
+    payload = _build_claims({"sub": "test_user"})
     assert "exp" in payload
-    assert isinstance(payload["exp"], int)
-
-    # 验证: exp 时间在未来
-    current_timestamp = datetime.now(timezone.utc).timestamp()
-    assert payload["exp"] > current_timestamp
 
-    # 验证: exp 时间在合理范围内 (默认 30 分钟)
-    expected_exp = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    exp_datetime = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
-
-    # 允许 5 秒误差 (测试执行时间)
-    time_diff = abs((exp_datetime - expected_exp).total_seconds())
-    assert time_diff < 5
+    # 验证: exp 换算回 UTC 时间后, 恰好是签发时刻 + 默认有效期
+    exp_datetime = datetime.fromtimestamp(payload["exp"], tz=_UTC)
+    assert exp_datetime == now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
     print(f"✅ JWT exp 字段验证通过: {exp_datetime.isoformat()}")
 
@@ -57,24 +48,21 @@ def test_token_expiration_across_timezones():
     - JWT 验证不受服务器时区影响 (PyJWT 自动处理)
     - datetime.now(timezone.utc) 确保应用层时间一致性
     """
-    import jwt
-    from app.core.config import settings
-
-    # 创建短期 token (5 秒过期)
-    short_token = create_access_token(
-        data={"sub": "test_user"},
-        expires_delta=timedelta(seconds=5)
-    )
+    now = datetime.now(_UTC)
 
-    # 立即验证 token (应该有效)
-    payload = jwt.decode(short_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    # 短期 token (5 秒过期) 的 claims, 无需编码再解码
+    payload = _build_claims({"sub": "test_user"}, expires_delta=timedelta(seconds=5))
     assert payload["sub"] == "test_user"
 
     # 验证 exp 时间是 timezone-aware
     exp_timestamp = payload["exp"]
-    exp_datetime = datetime.fromtimestamp(exp_timestamp, tz=timezone.utc)
+    exp_datetime = datetime.fromtimestamp(exp_timestamp, tz=_UTC)
     assert exp_datetime.tzinfo is not None
-    assert exp_datetime.tzinfo == timezone.utc
+    assert exp_datetime.tzinfo == _UTC
+
+    # exp 是整秒时间戳 (向下取整), 允许 1 秒误差
+    expected_exp = now + timedelta(seconds=5)
+    assert abs((exp_datetime - expected_exp).total_seconds()) <= 1
 
     print(f"✅ 跨时区验证通过: exp={exp_datetime.isoformat()}")
 
@@ -1,48 +1,19 @@
 import asyncio
-import io
-import types
 import uuid
 
-from fastapi.testclient import TestClient
+from sqlalchemy import select
 
-from app.main import app
 from app.database import SessionLocal
 from app.models.upload_job import UploadJob
 from app.services import pipeline_runner
+from tests._urls import NOTES_FROM_IMAGE
 
-client = TestClient(app)
 
-MINIMAL_PNG = (
-    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01"
-    b"\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde\x00\x00"
-    b"\x00\x0cIDATx\x9cc\xf8\xff\xff?\x00\x05\xfe\x02\xfe"
-    b"\xdc\xccY\xe7\x00\x00\x00\x00IEND\xaeB`\x82"
-)
-
-
-def _register_and_login(username: str, password: str = "pass1234") -> tuple[str, str]:
-    register_payload = {
-        "username": username,
-        "password": password,
-        "email": f"{username}@example.com",
-    }
-    resp = client.post("/api/v1/auth/register", json=register_payload)
-    assert resp.status_code == 201
-    user_id = resp.json()["id"]
-
-    login_payload = {"username": username, "password": password}
-    login_resp = client.post("/api/v1/auth/login", json=login_payload)
-    assert login_resp.status_code == 200
-    return user_id, login_resp.json()["access_token"]
-
-
-def test_create_note_from_image_enqueues_background_task(monkeypatch):
-    unique_username = f"async-user-{uuid.uuid4()}"
-    _, token = _register_and_login(unique_username)
+def test_create_note_from_image_enqueues_background_task(test_client, auth_user, monkeypatch, doubao_stub, png_bytes):
+    _, token = auth_user
     headers = {"Authorization": f"Bearer {token}"}
 
     from app.api.v1.endpoints import library
-    from app.core import dependencies
 
     async def dummy_process(*args, **kwargs):
         dummy_process.called = True
@@ -63,17 +34,16 @@ def test_create_note_from_image_enqueues_background_task(monkeypatch):
 
     fake_create_task.coro = None
 
-    dummy_doubao_service = types.SimpleNamespace(is_available=True, availability_status=lambda: (True, None))
+    dummy_doubao_service = doubao_stub()
 
     monkeypatch.setattr(library, "process_note_job", dummy_process)
     monkeypatch.setattr(library.asyncio, "create_task", fake_create_task)
     monkeypatch.setattr(library, "doubao_service", dummy_doubao_service)
-    monkeypatch.setattr(dependencies, "doubao_service", dummy_doubao_service)
 
-    response = client.post(
-        "/api/v1/library/notes/from-image",
+    response = test_client.post(
+        NOTES_FROM_IMAGE,
         headers=headers,
-        files={"file": ("test_upload.png", io.BytesIO(MINIMAL_PNG), "image/png")},
+        files={"file": ("test_upload.png", png_bytes, "image/png")},
         data={"note_type": "study note", "tags": "demo,test"},
     )
 
@@ -85,14 +55,39 @@ def test_create_note_from_image_enqueues_background_task(monkeypatch):
     assert fake_create_task.coro is not None
 
     with SessionLocal() as session:
-        job = session.query(UploadJob).filter(UploadJob.id == payload["job_id"]).first()
+        job = session.scalar(select(UploadJob).where(UploadJob.id == payload["job_id"]))
         assert job is not None
         assert job.status == "QUEUED"
 
 
-def test_job_progress_stream(monkeypatch):
-    unique_username = f"stream-user-{uuid.uuid4()}"
-    user_id, token = _register_and_login(unique_username)
+def test_create_note_from_image_returns_503_when_doubao_unavailable(
+    test_client, auth_user, monkeypatch, doubao_stub, png_bytes, real_doubao_check
+):
+    _, token = auth_user
+
+    from app.core import dependencies
+
+    monkeypatch.setattr(
+        dependencies,
+        "doubao_service",
+        doubao_stub(is_available=False, unavailable_reason="DOUBAO_API_KEY 未配置"),
+    )
+
+    response = test_client.post(
+        NOTES_FROM_IMAGE,
+        headers={"Authorization": f"Bearer {token}"},
+        files={"file": ("test_upload.png", png_bytes, "image/png")},
+        data={"note_type": "study note"},
+    )
+
+    assert response.status_code == 503
+    payload = response.json()
+    assert payload["error"] == "DoubaoServiceUnavailable"
+    assert "DOUBAO_API_KEY" in payload["detail"]
+
+
+def test_job_progress_stream(test_client, auth_user, monkeypatch):
+    user_id, token = auth_user
     headers = {"Authorization": f"Bearer {token}"}
 
     job_id = str(uuid.uuid4())
@@ -126,7 +121,7 @@ def test_job_progress_stream(monkeypatch):
 
     monkeypatch.setattr(upload.asyncio, "sleep", fast_sleep)
 
-    with client.stream(
+    with test_client.stream(
         "GET",
         f"/api/v1/upload/jobs/{job_id}/stream",
         headers=headers,
@@ -138,9 +133,8 @@ def test_job_progress_stream(monkeypatch):
     assert job_id in body
 
 
-def test_process_note_job_with_doubao(monkeypatch):
-    unique_username = f"doubao-user-{uuid.uuid4()}"
-    user_id, _ = _register_and_login(unique_username)
+def test_process_note_job_with_doubao(test_client, auth_user, monkeypatch, doubao_stub):
+    user_id, _ = auth_user
 
     job_id = str(uuid.uuid4())
     with SessionLocal() as session:
@@ -176,31 +170,8 @@ def test_process_note_job_with_doubao(monkeypatch):
 
     monkeypatch.setattr(pipeline_runner.settings, "USE_DOUBAO_PIPELINE", True)
 
-    class DummyDoubao:
-        is_available = True
-
-        @staticmethod
-        def generate_structured_note(
-            image_paths,
-            *,
-            note_type,
-            tags,
-            detail=None,
-            max_completion_tokens=None,
-            thinking=None,
-        ):
-            assert image_paths == ["fake-path"]
-            return {
-                "note": fake_note_payload,
-                "raw_text": "Raw text",
-                "response": {"id": "resp-1", "usage": {"input_tokens": 10, "output_tokens": 20}},
-            }
-
-        @staticmethod
-        def availability_status():
-            return True, None
-
-    monkeypatch.setattr(pipeline_runner, "doubao_service", DummyDoubao(), raising=False)
+    stub = doubao_stub(note_payload=fake_note_payload)
+    monkeypatch.setattr(pipeline_runner, "doubao_service", stub, raising=False)
 
     asyncio.run(
         pipeline_runner.process_note_job(
@@ -212,8 +183,10 @@ def test_process_note_job_with_doubao(monkeypatch):
         )
     )
 
+    assert stub.calls[0]["image_paths"] == ["fake-path"]
+
     with SessionLocal() as session:
-        job = session.query(UploadJob).filter(UploadJob.id == job_id).first()
+        job = session.scalar(select(UploadJob).where(UploadJob.id == job_id))
         assert job is not None
         assert job.status == "PERSISTED"
         assert job.ai_result.get("title") == "Sample Note"
@@ -225,9 +198,8 @@ def test_process_note_job_with_doubao(monkeypatch):
         assert note.structured_data.get("meta", {}).get("provider") == "doubao"
 
 
-def test_process_note_job_without_doubao_fails(monkeypatch):
-    unique_username = f"doubao-fail-user-{uuid.uuid4()}"
-    user_id, _ = _register_and_login(unique_username)
+def test_process_note_job_without_doubao_fails(test_client, auth_user, monkeypatch, doubao_stub):
+    user_id, _ = auth_user
 
     job_id = str(uuid.uuid4())
     with SessionLocal() as session:
@@ -255,26 +227,12 @@ def test_process_note_job_without_doubao_fails(monkeypatch):
     monkeypatch.setattr(pipeline_runner.settings, "USE_DOUBAO_PIPELINE", True)
     monkeypatch.setattr(pipeline_runner.settings, "DOUBAO_ALLOW_LEGACY_FALLBACK", False)
 
-    class FailingDoubao:
-        is_available = False
-
-        @staticmethod
-        def generate_structured_note(
-            image_paths,
-            *,
-            note_type,
-            tags,
-            detail=None,
-            max_completion_tokens=None,
-            thinking=None,
-        ):
-            raise pipeline_runner.DoubaoServiceError("missing doubao client")
-
-        @staticmethod
-        def availability_status():
-            return False, "Doubao SDK not installed"
-
-    monkeypatch.setattr(pipeline_runner, "doubao_service", FailingDoubao(), raising=False)
+    failing_doubao = doubao_stub(
+        is_available=False,
+        error=pipeline_runner.DoubaoServiceError("missing doubao client"),
+        unavailable_reason="Doubao SDK not installed",
+    )
+    monkeypatch.setattr(pipeline_runner, "doubao_service", failing_doubao, raising=False)
 
     asyncio.run(
         pipeline_runner.process_note_job(
@@ -287,7 +245,7 @@ def test_process_note_job_without_doubao_fails(monkeypatch):
     )
 
     with SessionLocal() as session:
-        job = session.query(UploadJob).filter(UploadJob.id == job_id).first()
+        job = session.scalar(select(UploadJob).where(UploadJob.id == job_id))
         assert job is not None
         assert job.status == "FAILED"
         assert job.error_logs, "Expected Doubao failure reason to be logged"
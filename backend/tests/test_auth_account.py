@@ -1,23 +1,15 @@
 import uuid
 
-from fastapi.testclient import TestClient
+from sqlalchemy import select
 
-from app.database import Base, SessionLocal, engine
-from app.main import app
+from app.database import SessionLocal
 from app.models.email_verification_code import EmailVerificationCode
 from app.models.note import Note
 from app.models.user import User
 from app.services.note_service import NoteService
 
-client = TestClient(app)
 
-# Ensure schema stays in sync with ORM models for this module.
-if engine.dialect.name == "sqlite":
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
-
-
-def _register_and_login(username: str, password: str = "pass1234"):
+def _register_and_login(client, username: str, password: str = "pass1234"):
     register_payload = {
         "username": username,
         "password": password,
@@ -35,23 +27,22 @@ def _register_and_login(username: str, password: str = "pass1234"):
 
 
 def _get_latest_email_code(email: str, purpose: str) -> str:
+    # Fetch only the code column; full ORM rows are not needed here.
     with SessionLocal() as session:
-        record = (
-            session.query(EmailVerificationCode)
-            .filter(
+        return session.execute(
+            select(EmailVerificationCode.code)
+            .where(
                 EmailVerificationCode.email == email,
                 EmailVerificationCode.purpose == purpose,
             )
             .order_by(EmailVerificationCode.created_at.desc())
-            .first()
-        )
-        assert record is not None
-        return record.code
+            .limit(1)
+        ).scalar_one()
 
 
-def test_delete_user_removes_account_and_notes():
+def test_delete_user_removes_account_and_notes(test_client):
     unique_username = f"user-{uuid.uuid4()}"
-    user_id, token = _register_and_login(unique_username)
+    user_id, token = _register_and_login(test_client, unique_username)
 
     with SessionLocal() as session:
         note_service = NoteService(session)
@@ -71,33 +62,33 @@ def test_delete_user_removes_account_and_notes():
         )
 
     headers = {"Authorization": f"Bearer {token}"}
-    delete_resp = client.delete("/api/v1/auth/me", headers=headers)
+    delete_resp = test_client.delete("/api/v1/auth/me", headers=headers)
     assert delete_resp.status_code == 200
     assert delete_resp.json().get("message") == "用户已注销"
 
     with SessionLocal() as session:
-        note = session.query(Note).filter(Note.user_id == user_id).first()
+        note = session.execute(select(Note).where(Note.user_id == user_id)).scalars().first()
         assert note is None
-        user_record = session.query(User).filter(User.id == user_id).first()
+        user_record = session.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
         assert user_record is None
 
 
-def test_change_password_requires_correct_old_password():
+def test_change_password_requires_correct_old_password(test_client):
     username = f"change-pwd-{uuid.uuid4().hex[:10]}"
     old_password = "OldPassword123"
     new_password = "NewPassword456"
-    _, token = _register_and_login(username, old_password)
+    _, token = _register_and_login(test_client, username, old_password)
 
     headers = {"Authorization": f"Bearer {token}"}
 
-    bad_resp = client.post(
+    bad_resp = test_client.post(
         "/api/v1/auth/password/change",
         json={"old_password": "WrongPassword", "new_password": new_password},
         headers=headers,
     )
     assert bad_resp.status_code == 400
 
-    good_resp = client.post(
+    good_resp = test_client.post(
         "/api/v1/auth/password/change",
         json={"old_password": old_password, "new_password": new_password},
         headers=headers,
@@ -105,71 +96,71 @@ def test_change_password_requires_correct_old_password():
     assert good_resp.status_code == 200
     assert good_resp.json().get("message") == "密码修改成功"
 
-    old_login_resp = client.post(
+    old_login_resp = test_client.post(
         "/api/v1/auth/login",
         json={"username": username, "password": old_password},
     )
     assert old_login_resp.status_code == 401
 
-    new_login_resp = client.post(
+    new_login_resp = test_client.post(
         "/api/v1/auth/login",
         json={"username": username, "password": new_password},
     )
     assert new_login_resp.status_code == 200
 
 
-def test_reset_password_by_email_verification_code(monkeypatch):
+def test_reset_password_by_email_verification_code(test_client, monkeypatch):
     username = f"reset-pwd-{uuid.uuid4().hex[:10]}"
     old_password = "OldPassword123"
     new_password = "NewPassword456"
     email = f"{username}@example.com"
-    _register_and_login(username, old_password)
+    _register_and_login(test_client, username, old_password)
 
     monkeypatch.setattr(
         "app.api.v1.endpoints.auth.email_service.send_verification_code",
         lambda *_args, **_kwargs: True,
     )
 
-    send_resp = client.post(
+    send_resp = test_client.post(
         "/api/v1/auth/email/send-code",
         json={"email": email, "purpose": "reset_password"},
     )
     assert send_resp.status_code == 200
 
     code = _get_latest_email_code(email, "reset_password")
-    reset_resp = client.post(
+    reset_resp = test_client.post(
         "/api/v1/auth/password/reset",
         json={"email": email, "code": code, "new_password": new_password},
     )
     assert reset_resp.status_code == 200
     assert reset_resp.json().get("message") == "密码已重置"
 
-    old_login_resp = client.post(
+    old_login_resp = test_client.post(
         "/api/v1/auth/login",
         json={"username": username, "password": old_password},
     )
     assert old_login_resp.status_code == 401
 
-    new_login_resp = client.post(
+    new_login_resp = test_client.post(
         "/api/v1/auth/login",
         json={"username": username, "password": new_password},
     )
     assert new_login_resp.status_code == 200
 
 
-def test_change_bound_email_by_verification_code(monkeypatch):
+def test_change_bound_email_by_verification_code(test_client, monkeypatch):
     username = f"change-email-{uuid.uuid4().hex[:10]}"
     password = "ChangeEmail123"
     old_email = f"{username}@example.com"
     new_email = f"new-{uuid.uuid4().hex[:10]}@example.com"
-    _, token = _register_and_login(username, password)
+    _, token = _register_and_login(test_client, username, password)
 
     monkeypatch.setattr(
         "app.api.v1.endpoints.auth.email_service.send_verification_code",
         lambda *_args, **_kwargs: True,
     )
 
-    send_resp = client.post(
+    send_resp = test_client.post(
         "/api/v1/auth/email/send-code",
         json={"email": new_email, "purpose": "change_email"},
     )
@@ -177,7 +168,7 @@ def test_change_bound_email_by_verification_code(monkeypatch):
 
     code = _get_latest_email_code(new_email, "change_email")
     headers = {"Authorization": f"Bearer {token}"}
-    change_resp = client.post(
+    change_resp = test_client.post(
         "/api/v1/auth/email/change",
         json={"new_email": new_email, "code": code},
         headers=headers,
@@ -185,16 +176,16 @@ def test_change_bound_email_by_verification_code(monkeypatch):
     assert change_resp.status_code == 200
     assert change_resp.json().get("email") == new_email
 
-    me_resp = client.get("/api/v1/auth/me", headers=headers)
+    me_resp = test_client.get("/api/v1/auth/me", headers=headers)
     assert me_resp.status_code == 200
     assert me_resp.json().get("email") == new_email
     assert me_resp.json().get("email") != old_email
 
 
-def test_email_login_requires_registered_email():
+def test_email_login_requires_registered_email(test_client):
     email = f"unregistered-{uuid.uuid4().hex[:10]}@example.com"
 
-    resp = client.post(
+    resp = test_client.post(
         "/api/v1/auth/email/login",
         json={"email": email, "code": "123456"},
     )
@@ -202,10 +193,10 @@ def test_email_login_requires_registered_email():
     assert resp.json().get("detail") == "该邮箱未注册"
 
 
-def test_reset_password_requires_registered_email():
+def test_reset_password_requires_registered_email(test_client):
     email = f"unregistered-{uuid.uuid4().hex[:10]}@example.com"
 
-    resp = client.post(
+    resp = test_client.post(
         "/api/v1/auth/password/reset",
         json={"email": email, "code": "123456", "new_password": "NewPassword456"},
     )
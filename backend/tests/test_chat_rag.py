@@ -4,6 +4,7 @@ import json
 import time
 
 import pytest
+from sqlalchemy import select
 
 from app.database import SessionLocal
 from app.models.note import Note
@@ -984,7 +985,7 @@ def test_accept_suggestion_commits_note_and_suggestion_once(db_session, test_use
 
     assert accepted.status == "accepted"
     assert accepted.note_id
-    note = db_session.query(Note).filter(Note.id == accepted.note_id).first()
+    note = db_session.scalar(select(Note).where(Note.id == accepted.note_id))
     assert note is not None
     assert note.title == accepted.title
     assert note.category == "数学"
@@ -2268,7 +2269,7 @@ def test_suggestion_accept_and_dismiss_endpoints(test_client, monkeypatch):
     assert accept_payload["suggestion"]["category"] == "专项复习"
     assert accept_payload["note_id"]
     with SessionLocal() as session:
-        accepted_note = session.query(Note).filter(Note.id == accept_payload["note_id"]).first()
+        accepted_note = session.scalar(select(Note).where(Note.id == accept_payload["note_id"]))
         assert accepted_note is not None
         assert accepted_note.category == "专项复习"
         assert accepted_note.structured_data["meta"]["category"] == "专项复习"
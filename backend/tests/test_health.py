@@ -1,11 +1,5 @@
-from fastapi.testclient import TestClient
-
-from app.main import app
-
-
-def test_health_endpoint():
-    client = TestClient(app)
-    response = client.get("/health")
+def test_health_endpoint(test_client):
+    response = test_client.get("/health")
     assert response.status_code == 200
     payload = response.json()
     assert payload.get("status") == "healthy"
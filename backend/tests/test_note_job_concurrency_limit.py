@@ -0,0 +1,57 @@
+import uuid
+
+from sqlalchemy import func, select
+
+from app.database import SessionLocal
+from app.models.upload_job import UploadJob
+from app.services.input_pipeline_service import MAX_CONCURRENT_NOTE_JOBS_PER_USER
+from tests._urls import NOTES_FROM_IMAGE
+
+
+def _seed_active_jobs(user_id: str, count: int) -> None:
+    # One multi-row INSERT; these rows only need to exist for count_active_jobs.
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "device_id": user_id,
+            "source": "library_from_image",
+            "status": "QUEUED",
+            "file_meta": {"files": [], "total_size": 0},
+            "storage": [],
+        }
+        for _ in range(count)
+    ]
+    with SessionLocal() as session:
+        session.bulk_insert_mappings(UploadJob, rows)
+        session.commit()
+
+
+def test_create_note_from_image_rejects_when_active_jobs_reach_limit(
+    test_client, fresh_auth_user, monkeypatch, png_bytes
+):
+    user_id, token = fresh_auth_user
+    _seed_active_jobs(user_id, MAX_CONCURRENT_NOTE_JOBS_PER_USER)
+
+    from app.api.v1.endpoints import library
+
+    async def dummy_process(*args, **kwargs):
+        raise AssertionError("process_note_job should not be scheduled when the limit is reached")
+
+    monkeypatch.setattr(library, "process_note_job", dummy_process)
+
+    response = test_client.post(
+        NOTES_FROM_IMAGE,
+        headers={"Authorization": f"Bearer {token}"},
+        files={"file": ("test_upload.png", png_bytes, "image/png")},
+        data={"note_type": "study note"},
+    )
+
+    assert response.status_code == 429
+    assert str(MAX_CONCURRENT_NOTE_JOBS_PER_USER) in response.json()["detail"]
+
+    with SessionLocal() as session:
+        job_count = session.scalar(
+            select(func.count()).select_from(UploadJob).where(UploadJob.user_id == user_id)
+        )
+    assert job_count == MAX_CONCURRENT_NOTE_JOBS_PER_USER
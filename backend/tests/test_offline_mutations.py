@@ -1,38 +1,13 @@
 import uuid
 
 import pytest
+from sqlalchemy import select
 
 from app.database import SessionLocal
 from app.models.deletion_log import DeletionLog
 from app.models.note import Note
 from app.services.note_service import NoteService
-
-
-def _register_and_login(test_client):
-    username = f"offline_{uuid.uuid4().hex[:8]}"
-    password = "TestPassword123"
-    email = f"{username}@example.com"
-
-    register_resp = test_client.post(
-        "/api/v1/auth/register",
-        json={"username": username, "password": password, "email": email},
-    )
-    assert register_resp.status_code in (200, 201)
-
-    login_resp = test_client.post(
-        "/api/v1/auth/login",
-        json={"username": username, "password": password},
-    )
-    assert login_resp.status_code == 200
-    token = login_resp.json()["access_token"]
-
-    me_resp = test_client.get(
-        "/api/v1/auth/me",
-        headers={"Authorization": f"Bearer {token}"},
-    )
-    assert me_resp.status_code == 200
-    user_id = me_resp.json()["id"]
-    return user_id, token
+from tests._urls import NOTES_MUTATIONS
 
 
 def _create_note_for_user(user_id: str, *, title: str) -> str:
@@ -54,11 +29,11 @@ def _create_note_for_user(user_id: str, *, title: str) -> str:
 @pytest.mark.integration
 class TestOfflineMutationsEndpoint:
     def test_mutations_requires_auth(self, test_client):
-        response = test_client.post("/api/v1/library/notes/mutations", json={"mutations": []})
+        response = test_client.post(NOTES_MUTATIONS, json={"mutations": []})
         assert response.status_code == 401
 
-    def test_mutations_apply_update_favorite_delete(self, test_client):
-        user_id, token = _register_and_login(test_client)
+    def test_mutations_apply_update_favorite_delete(self, test_client, auth_user):
+        user_id, token = auth_user
         note_update_id = _create_note_for_user(user_id, title="offline-update")
         note_favorite_id = _create_note_for_user(user_id, title="offline-favorite")
         note_delete_id = _create_note_for_user(user_id, title="offline-delete")
@@ -86,7 +61,7 @@ class TestOfflineMutationsEndpoint:
         }
 
         response = test_client.post(
-            "/api/v1/library/notes/mutations",
+            NOTES_MUTATIONS,
             json=payload,
             headers={"Authorization": f"Bearer {token}"},
         )
@@ -98,11 +73,17 @@ class TestOfflineMutationsEndpoint:
         assert len(body["results"]) == 3
         assert all(item["status"] == "applied" for item in body["results"])
 
+        note_ids = [note_update_id, note_favorite_id, note_delete_id]
         with SessionLocal() as session:
-            updated_note = session.query(Note).filter(Note.id == note_update_id).first()
-            favorited_note = session.query(Note).filter(Note.id == note_favorite_id).first()
-            deleted_note = session.query(Note).filter(Note.id == note_delete_id).first()
-            deletion_log = session.query(DeletionLog).filter(DeletionLog.note_id == note_delete_id).first()
+            notes = {note.id: note for note in session.scalars(select(Note).where(Note.id.in_(note_ids)))}
+            deletion_logs = {
+                log.note_id: log
+                for log in session.scalars(select(DeletionLog).where(DeletionLog.note_id.in_(note_ids)))
+            }
+            updated_note = notes.get(note_update_id)
+            favorited_note = notes.get(note_favorite_id)
+            deleted_note = notes.get(note_delete_id)
+            deletion_log = deletion_logs.get(note_delete_id)
 
             assert updated_note is not None
             assert updated_note.title == "offline-updated-title"
@@ -115,48 +96,77 @@ class TestOfflineMutationsEndpoint:
             assert deletion_log is not None
             assert deletion_log.user_id == user_id
 
-    def test_mutations_partial_failures_reported(self, test_client):
-        user_id, token = _register_and_login(test_client)
-        note_id = _create_note_for_user(user_id, title="offline-invalid")
 
-        payload = {
-            "mutations": [
-                {
-                    "op_id": "op-invalid-update",
-                    "type": "update_note",
-                    "note_id": note_id,
-                },
-                {
-                    "op_id": "op-invalid-favorite",
-                    "type": "set_favorite",
-                    "note_id": note_id,
-                },
-                {
-                    "op_id": "op-missing-note",
-                    "type": "delete_note",
-                    "note_id": str(uuid.uuid4()),
-                },
-            ]
-        }
+@pytest.mark.integration
+class TestOfflineMutationFailures:
+    """每种失败场景单独成用例，共享同一用户与笔记"""
+
+    @pytest.fixture(scope="class")
+    def invalid_note_id(self, auth_user):
+        user_id, _ = auth_user
+        return _create_note_for_user(user_id, title="offline-invalid")
+
+    @pytest.mark.parametrize(
+        "op_id, mutation_type, target_exists, expected_status, expected_code",
+        [
+            ("op-invalid-update", "update_note", True, "invalid", 422),
+            ("op-invalid-favorite", "set_favorite", True, "invalid", 422),
+            ("op-missing-note", "delete_note", False, "not_found", 404),
+        ],
+    )
+    def test_mutation_failure_reported(
+        self,
+        test_client,
+        auth_user,
+        invalid_note_id,
+        op_id,
+        mutation_type,
+        target_exists,
+        expected_status,
+        expected_code,
+    ):
+        _, token = auth_user
+        note_id = invalid_note_id if target_exists else str(uuid.uuid4())
 
         response = test_client.post(
-            "/api/v1/library/notes/mutations",
-            json=payload,
+            NOTES_MUTATIONS,
+            json={"mutations": [{"op_id": op_id, "type": mutation_type, "note_id": note_id}]},
             headers={"Authorization": f"Bearer {token}"},
         )
         assert response.status_code == 200
         body = response.json()
 
         assert body["applied_count"] == 0
-        assert body["failed_count"] == 3
-
-        results = {item["op_id"]: item for item in body["results"]}
-
-        assert results["op-invalid-update"]["status"] == "invalid"
-        assert results["op-invalid-update"]["code"] == 422
+        assert body["failed_count"] == 1
+
+        (result,) = body["results"]
+        assert result["op_id"] == op_id
+        assert result["status"] == expected_status
+        assert result["code"] == expected_code
+
+    def test_batch_reports_every_failure(self, test_client, auth_user, invalid_note_id):
+        """同一请求内多条失败操作须全部出现在 results 中"""
+        _, token = auth_user
+        expected = {
+            "op-batch-invalid-update": ("invalid", 422),
+            "op-batch-invalid-favorite": ("invalid", 422),
+            "op-batch-missing-note": ("not_found", 404),
+        }
 
-        assert results["op-invalid-favorite"]["status"] == "invalid"
-        assert results["op-invalid-favorite"]["code"] == 422
+        response = test_client.post(
+            NOTES_MUTATIONS,
+            json={
+                "mutations": [
+                    {"op_id": "op-batch-invalid-update", "type": "update_note", "note_id": invalid_note_id},
+                    {"op_id": "op-batch-invalid-favorite", "type": "set_favorite", "note_id": invalid_note_id},
+                    {"op_id": "op-batch-missing-note", "type": "delete_note", "note_id": str(uuid.uuid4())},
+                ]
+            },
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 200
+        body = response.json()
 
-        assert results["op-missing-note"]["status"] == "not_found"
-        assert results["op-missing-note"]["code"] == 404
+        assert body["applied_count"] == 0
+        assert body["failed_count"] == len(expected)
+        assert {r["op_id"]: (r["status"], r["code"]) for r in body["results"]} == expected
@@ -1,4 +1,12 @@
-from app.services.prompt_profiles import resolve_prompt_profile
+import pytest
+
+from app.services.prompt_profiles import (
+    delete_prompt_profile,
+    resolve_prompt_profile,
+    save_prompt_profile,
+)
+
+pytestmark = pytest.mark.usefixtures("seeded_profiles")
 
 
 def test_resolve_profile_aliases():
@@ -22,3 +30,22 @@ def test_unknown_subject_falls_back_to_general():
     assert profile.key == "general"
     system_prompt, _ = profile.render_prompts(note_type="未知学科", tags=[])
     assert "智能视觉记录助手" in system_prompt
+
+
+def test_resolve_reflects_saved_profile_after_cached_lookup():
+    assert resolve_prompt_profile("化学").key == "general"
+
+    save_prompt_profile(
+        {
+            "key": "chemistry",
+            "aliases": ["化学"],
+            "system_template": "你是一位化学老师。",
+            "user_template": "当前主题：{note_type}；标签：{tags_text}。",
+        }
+    )
+    try:
+        assert resolve_prompt_profile("化学").key == "chemistry"
+    finally:
+        delete_prompt_profile("chemistry")
+
+    assert resolve_prompt_profile("化学").key == "general"
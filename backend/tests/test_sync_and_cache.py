@@ -6,15 +6,17 @@
 - 删除笔记后 DeletionLog 是否正确写入
 """
 
+import asyncio
 import uuid
 from datetime import datetime, timedelta, timezone
 
 import pytest
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.models.note import Note
 from app.models.deletion_log import DeletionLog
-from app.services.note_service import NoteService
+from tests._urls import NOTES, NOTES_BATCH, NOTES_SYNC
 
 
 # ========================================
@@ -26,8 +28,7 @@ from app.services.note_service import NoteService
 class TestNoteServiceSync:
     """NoteService 增量同步相关方法测试"""
 
-    def _create_note(self, db: Session, user_id: str, **overrides) -> Note:
-        """快捷创建笔记"""
+    def _build_note(self, user_id: str, **overrides) -> Note:
         defaults = dict(
             id=str(uuid.uuid4()),
             user_id=user_id,
@@ -44,86 +45,85 @@ class TestNoteServiceSync:
             is_archived=False,
         )
         defaults.update(overrides)
-        note = Note(**defaults)
+        return Note(**defaults)
+
+    def _create_note(self, db: Session, user_id: str, **overrides) -> Note:
+        """快捷创建笔记"""
+        note = self._build_note(user_id, **overrides)
         db.add(note)
-        db.commit()
-        db.refresh(note)
+        db.flush()
         return note
 
-    def test_get_notes_updated_since_returns_new_notes(self, db_session, test_user):
+    def _create_notes_bulk(self, db: Session, user_id: str, titles: list[str], **overrides) -> list[Note]:
+        """批量创建笔记（绕过 unit-of-work，直接批量 INSERT）"""
+        notes = [self._build_note(user_id, title=title, **overrides) for title in titles]
+        db.bulk_save_objects(notes, return_defaults=True)
+        return notes
+
+    def test_get_notes_updated_since_returns_new_notes(self, note_service, db_session, test_user):
         """since 之后创建的笔记应被返回"""
-        svc = NoteService(db_session)
         past = datetime.now(timezone.utc) - timedelta(hours=1)
 
-        n1 = self._create_note(db_session, test_user.id, title="新笔记1")
-        n2 = self._create_note(db_session, test_user.id, title="新笔记2")
+        n1, n2 = self._create_notes_bulk(db_session, test_user.id, ["新笔记1", "新笔记2"])
 
-        results = svc.get_notes_updated_since(test_user.id, past)
+        results = note_service.get_notes_updated_since(test_user.id, past)
         ids = {r.id for r in results}
         assert n1.id in ids
         assert n2.id in ids
 
-    def test_get_notes_updated_since_excludes_old(self, db_session, test_user):
+    def test_get_notes_updated_since_excludes_old(self, note_service, db_session, test_user):
         """since 之前的笔记不应被返回（通过将 since 设为未来时间模拟）"""
-        svc = NoteService(db_session)
         future = datetime.now(timezone.utc) + timedelta(hours=1)
 
         self._create_note(db_session, test_user.id, title="旧笔记")
 
-        results = svc.get_notes_updated_since(test_user.id, future)
+        results = note_service.get_notes_updated_since(test_user.id, future)
         assert len(results) == 0
 
-    def test_get_notes_updated_since_respects_until(self, db_session, test_user):
+    def test_get_notes_updated_since_respects_until(self, note_service, db_session, test_user):
         """增量查询应遵循 until 上界（用于避免同步窗口漏/重）"""
-        svc = NoteService(db_session)
         since = datetime.now(timezone.utc) - timedelta(hours=1)
 
-        note = self._create_note(db_session, test_user.id, title="窗口测试")
+        # 显式写入 created_at，避免 flush 后为读取服务端默认值再发一次 SELECT
+        created_at = datetime.now(timezone.utc)
+        note = self._create_note(db_session, test_user.id, title="窗口测试", created_at=created_at)
 
         # 将 until 设置到 created_at 之前，确保该笔记不会被返回
-        until = note.created_at - timedelta(seconds=1)
-        results = svc.get_notes_updated_since(test_user.id, since, until=until)
+        until = created_at - timedelta(seconds=1)
+        results = note_service.get_notes_updated_since(test_user.id, since, until=until)
         assert all(item.id != note.id for item in results)
 
-    def test_delete_note_creates_deletion_log(self, db_session, test_user):
+    def test_delete_note_creates_deletion_log(self, note_service, db_session, test_user):
         """删除笔记时应写入 DeletionLog"""
-        svc = NoteService(db_session)
         note = self._create_note(db_session, test_user.id, title="待删除")
         note_id = note.id
 
-        result = svc.delete_note(note_id, test_user.id)
+        result = note_service.delete_note(note_id, test_user.id)
         assert result is True
+        assert db_session.scalar(select(Note).where(Note.id == note_id)) is None
 
         # 验证 DeletionLog 已写入
-        log = (
-            db_session.query(DeletionLog)
-            .filter(DeletionLog.note_id == note_id)
-            .first()
-        )
+        log = db_session.scalar(select(DeletionLog).where(DeletionLog.note_id == note_id))
         assert log is not None
         assert log.user_id == test_user.id
 
-    def test_get_deleted_note_ids_since(self, db_session, test_user):
+    def test_get_deleted_note_ids_since(self, note_service, db_session, test_user):
         """增量同步应返回 since 之后删除的笔记 ID"""
-        svc = NoteService(db_session)
         past = datetime.now(timezone.utc) - timedelta(hours=1)
 
         note = self._create_note(db_session, test_user.id, title="即将删除")
         note_id = note.id
-        svc.delete_note(note_id, test_user.id)
+        note_service.delete_note(note_id, test_user.id)
 
-        deleted_ids = svc.get_deleted_note_ids_since(test_user.id, past)
+        deleted_ids = note_service.get_deleted_note_ids_since(test_user.id, past)
         assert note_id in deleted_ids
 
-    def test_get_notes_by_ids_batch(self, db_session, test_user):
+    def test_get_notes_by_ids_batch(self, note_service, db_session, test_user):
         """批量获取应返回完整笔记（含 original_text & structured_data）"""
-        svc = NoteService(db_session)
 
-        n1 = self._create_note(db_session, test_user.id, title="批量1")
-        n2 = self._create_note(db_session, test_user.id, title="批量2")
-        n3 = self._create_note(db_session, test_user.id, title="批量3")
+        n1, n2, n3 = self._create_notes_bulk(db_session, test_user.id, ["批量1", "批量2", "批量3"])
 
-        results = svc.get_notes_by_ids(test_user.id, [n1.id, n3.id])
+        results = note_service.get_notes_by_ids(test_user.id, [n1.id, n3.id])
         ids = {r.id for r in results}
         assert n1.id in ids
         assert n3.id in ids
@@ -134,26 +134,23 @@ class TestNoteServiceSync:
             assert note.original_text is not None
             assert note.structured_data is not None
 
-    def test_get_notes_by_ids_ignores_other_user(self, db_session, test_user):
+    def test_get_notes_by_ids_ignores_other_user(self, note_service, db_session, test_user):
         """批量获取不应返回其他用户的笔记"""
-        svc = NoteService(db_session)
 
         other_note = self._create_note(
             db_session, "other-user-id", title="其他人的笔记", device_id="other-user-id"
         )
 
-        results = svc.get_notes_by_ids(test_user.id, [other_note.id])
+        results = note_service.get_notes_by_ids(test_user.id, [other_note.id])
         assert len(results) == 0
 
-    def test_get_note_count(self, db_session, test_user):
+    def test_get_note_count(self, note_service, db_session, test_user):
         """笔记计数应正确"""
-        svc = NoteService(db_session)
 
-        self._create_note(db_session, test_user.id, title="笔记A")
-        self._create_note(db_session, test_user.id, title="笔记B")
-        self._create_note(db_session, test_user.id, title="已归档", is_archived=True)
+        self._create_notes_bulk(db_session, test_user.id, ["笔记A", "笔记B"])
+        self._create_notes_bulk(db_session, test_user.id, ["已归档"], is_archived=True)
 
-        count = svc.get_note_count(test_user.id)
+        count = note_service.get_note_count(test_user.id)
         assert count == 2  # 不含已归档
 
 
@@ -168,31 +165,26 @@ class TestSyncEndpoint:
 
     def test_sync_requires_auth(self, test_client):
         """未认证应返回 401"""
-        resp = test_client.get("/api/v1/library/notes/sync")
+        resp = test_client.get(NOTES_SYNC)
         assert resp.status_code == 401
 
-    def test_sync_without_since_returns_all(self, test_client, auth_token):
-        """不传 since 应返回全量摘要"""
-        resp = test_client.get(
-            "/api/v1/library/notes/sync",
-            headers={"Authorization": f"Bearer {auth_token}"},
+    async def test_sync_with_and_without_since(self, aclient, auth_token):
+        """不传 since 返回全量摘要，传 since 正常返回增量；两次请求互不依赖，并发发出"""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        since = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+        full_resp, since_resp = await asyncio.gather(
+            aclient.get(NOTES_SYNC, headers=headers),
+            aclient.get(NOTES_SYNC, params={"since": since}, headers=headers),
         )
-        assert resp.status_code == 200
-        data = resp.json()
+
+        assert full_resp.status_code == 200
+        data = full_resp.json()
         assert "updated" in data
         assert "deleted_ids" in data
         assert "server_time" in data
 
-    def test_sync_with_since(self, test_client, auth_token):
-        """传 since 应正常返回"""
-        since = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
-        resp = test_client.get(
-            "/api/v1/library/notes/sync",
-            params={"since": since},
-            headers={"Authorization": f"Bearer {auth_token}"},
-        )
-        assert resp.status_code == 200
-        data = resp.json()
+        assert since_resp.status_code == 200
+        data = since_resp.json()
         assert isinstance(data["updated"], list)
         assert isinstance(data["deleted_ids"], list)
 
@@ -204,7 +196,7 @@ class TestBatchEndpoint:
     def test_batch_requires_auth(self, test_client):
         """未认证应返回 401"""
         resp = test_client.post(
-            "/api/v1/library/notes/batch",
+            NOTES_BATCH,
             json={"note_ids": [str(uuid.uuid4())]},
         )
         assert resp.status_code == 401
@@ -212,7 +204,7 @@ class TestBatchEndpoint:
     def test_batch_empty_list_rejected(self, test_client, auth_token):
         """空列表应被拒绝（min_length=1）"""
         resp = test_client.post(
-            "/api/v1/library/notes/batch",
+            NOTES_BATCH,
             json={"note_ids": []},
             headers={"Authorization": f"Bearer {auth_token}"},
         )
@@ -221,7 +213,7 @@ class TestBatchEndpoint:
     def test_batch_nonexistent_ids_returns_empty(self, test_client, auth_token):
         """不存在的 ID 应返回空列表"""
         resp = test_client.post(
-            "/api/v1/library/notes/batch",
+            NOTES_BATCH,
             json={"note_ids": [str(uuid.uuid4())]},
             headers={"Authorization": f"Bearer {auth_token}"},
         )
@@ -238,7 +230,7 @@ class TestNotesFavoriteFilterCompatibility:
     def test_list_notes_supports_is_favorite_param(self, test_client, auth_token):
         """应兼容 is_favorite=true 参数（与前端约定一致）"""
         resp = test_client.get(
-            "/api/v1/library/notes",
+            NOTES,
             params={"is_favorite": "true"},
             headers={"Authorization": f"Bearer {auth_token}"},
         )
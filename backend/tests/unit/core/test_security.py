@@ -8,12 +8,18 @@
 import pytest
 from datetime import datetime, timedelta, timezone
 
+import jwt
+from freezegun import freeze_time
+
+from app.core.config import settings
 from app.core.security import (
     create_access_token,
     verify_password,
     get_password_hash
 )
 
+_UTC = timezone.utc
+
 
 # ========================================
 # 测试用例 1: JWT Token 时区感知
@@ -21,6 +27,7 @@ from app.core.security import (
 
 @pytest.mark.unit
 @pytest.mark.security
+@pytest.mark.security_slow
 def test_create_access_token_timezone_aware():
     """测试: JWT Token exp 字段使用 timezone-aware datetime
 
@@ -46,10 +53,7 @@ def test_create_access_token_timezone_aware():
     assert isinstance(token, str)
     assert token.count(".") == 2
 
-    # 解码 Token (验证 exp 字段)
-    import jwt
-    from app.core.config import settings
-
+    # 解码 Token (验证 exp 字段): 全套件中唯一带 HMAC 验签的往返, 快速通道 (not security_slow) 跳过
     payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
 
     # 验证: exp 字段存在
@@ -151,13 +155,14 @@ def test_verify_password():
 
 @pytest.mark.unit
 @pytest.mark.security
+@freeze_time("2024-01-01 00:00:00", tz_offset=0)
 def test_token_expiration_across_timezones():
     """测试: 跨时区 Token 过期验证一致性
 
     验证重点:
     - Token 在不同时区验证结果一致
     - UTC 时间统一, 避免时区转换错误
-    - 过期时间精确 (误差 < 1s)
+    - 过期时间精确 (freeze_time 冻结时钟, 精确相等)
 
     学习要点:
     - Unix 时间戳: 与时区无关 (统一从 UTC 1970-01-01 算起)
@@ -175,24 +180,19 @@ def test_token_expiration_across_timezones():
         expires_delta=timedelta(seconds=5)
     )
 
-    # 验证: Token 立即可用
-    import jwt
-    from app.core.config import settings
-
-    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    # 验证: Token 立即可用 (只检查 exp, 跳过 HMAC 验签; 签名校验见 test_create_access_token_timezone_aware)
+    payload = jwt.decode(token, options={"verify_signature": False, "verify_exp": True})
     assert "sub" in payload
     assert payload["sub"] == "test_user"
 
     # 验证: exp 字段使用 timezone-aware datetime
     exp_timestamp = payload["exp"]
-    exp_datetime = datetime.fromtimestamp(exp_timestamp, tz=timezone.utc)
+    exp_datetime = datetime.fromtimestamp(exp_timestamp, tz=_UTC)
     assert exp_datetime.tzinfo is not None, "exp 应为 timezone-aware datetime"
-    assert exp_datetime.tzinfo == timezone.utc, "exp 应使用 UTC 时区"
+    assert exp_datetime.tzinfo == _UTC, "exp 应使用 UTC 时区"
 
-    # 验证: 过期时间精确 (5 秒后, 允许 1 秒误差)
-    expected_exp = datetime.now(timezone.utc) + timedelta(seconds=5)
-    time_diff = abs((expected_exp - exp_datetime).total_seconds())
-    assert time_diff < 1, f"过期时间误差: {time_diff}s (应 < 1s)"
+    # 验证: 过期时间精确 (时钟已冻结, 恰好是签发时刻 + 5 秒)
+    assert exp_datetime == datetime(2024, 1, 1, 0, 0, 5, tzinfo=timezone.utc)
 
 
 # ========================================
@@ -0,0 +1,35 @@
+import pytest
+
+from app.services import doubao_service as doubao_module
+from app.services.doubao_service import DoubaoVisionService
+
+
+@pytest.fixture
+def configured_doubao(monkeypatch):
+    monkeypatch.setattr(doubao_module, "Ark", object)
+    monkeypatch.setattr(doubao_module.settings, "DOUBAO_API_KEY", "test-api-key")
+    return DoubaoVisionService()
+
+
+@pytest.mark.unit
+def test_availability_status_available(configured_doubao):
+    available, reason = configured_doubao.availability_status()
+
+    assert isinstance(available, bool), "应返回布尔值"
+    assert available is True
+    assert reason is None
+    assert configured_doubao.is_available is True
+
+
+@pytest.mark.unit
+def test_availability_status_missing_credentials(configured_doubao, monkeypatch):
+    monkeypatch.setattr(doubao_module.settings, "DOUBAO_API_KEY", "")
+    monkeypatch.setattr(doubao_module.settings, "DOUBAO_ACCESS_KEY_ID", "")
+    monkeypatch.setattr(doubao_module.settings, "DOUBAO_SECRET_ACCESS_KEY", "")
+
+    available, reason = configured_doubao.availability_status()
+
+    assert isinstance(available, bool), "应返回布尔值"
+    assert available is False
+    assert reason is not None and "DOUBAO_API_KEY" in reason
+    assert configured_doubao.is_available is False